@@ -9,6 +9,7 @@ import time
 from datetime import datetime
 import statistics
 import sys
+from dataclasses import asdict
 sys.path.append('/app/backend')
 
 from scalping_engine import ScalpingEngine, Candle as ScalpCandle, SignalType as ScalpSignal
@@ -170,7 +171,7 @@ def test_engine_detailed(symbol, name, timeframe):
     
     for i in range(0, len(candles) - window - 30, step):
         analysis_window = candles[i:i+window]
-        future_candles = [c.__dict__ for c in candles[i+window:i+window+30]]
+        future_candles = [asdict(c) for c in candles[i+window:i+window+30]]
         
         signal_data = engine.analyze(analysis_window, 10000)
         
@@ -0,0 +1,768 @@
+"""
+⚙️ FOREX CORE - Núcleo numérico compartilhado pelos motores V2 e V3
+Tipos, indicadores e um único kernel de análise parametrizado por EngineParams
+"""
+
+import numpy as np
+from typing import List, Dict, Tuple, Union
+from dataclasses import dataclass, field
+from enum import Enum
+
+# 💡 scipy NÃO está em requirements.txt: o caminho lfilter é opt-in (quem instala
+# scipy ganha a recorrência em C); o padrão em produção é o loop em Python
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+class SignalType(Enum):
+    CALL = "CALL"
+    PUT = "PUT"
+    WAIT = "WAIT"
+
+class MarketStructure(Enum):
+    BULLISH = "BULLISH"  # Higher Highs + Higher Lows
+    BEARISH = "BEARISH"  # Lower Lows + Lower Highs
+    RANGING = "RANGING"  # Sem estrutura clara
+
+class TradingSession(Enum):
+    LONDON = "LONDON"  # 08:00-17:00 GMT
+    NEW_YORK = "NEW_YORK"  # 13:00-22:00 GMT
+    OVERLAP = "OVERLAP"  # 13:00-17:00 GMT (melhor)
+    ASIA = "ASIA"  # 00:00-09:00 GMT
+    OFF_HOURS = "OFF_HOURS"
+
+
+# Códigos inteiros usados pelo kernel numérico (sem Enums/strings no caminho quente)
+SIGNAL_WAIT, SIGNAL_CALL, SIGNAL_PUT = 0, 1, 2
+STRUCTURE_RANGING, STRUCTURE_BULLISH, STRUCTURE_BEARISH = 0, 1, 2
+SESSION_OFF_HOURS, SESSION_ASIA, SESSION_LONDON, SESSION_NEW_YORK, SESSION_OVERLAP = 0, 1, 2, 3, 4
+
+# Motivos de WAIT
+(WAIT_RANGING, WAIT_ASIA, WAIT_OFF_HOURS, WAIT_LOW_ATR, WAIT_NO_TREND,
+ WAIT_MISALIGNED, WAIT_NO_CONFIRMATION, WAIT_LOW_SCORE) = range(1, 9)
+
+# Motivos de pontuação
+(REASON_PULLBACK_IDEAL, REASON_PULLBACK_NEAR, REASON_PULLBACK_OUT, REASON_STRUCTURE,
+ REASON_SESSION_OVERLAP, REASON_SESSION_LONDON, REASON_SESSION_NEW_YORK,
+ REASON_ATR_IDEAL, REASON_ATR_OK, REASON_EMA200_FAR, REASON_EMA200) = range(11)
+
+_SIGNALS = (SignalType.WAIT, SignalType.CALL, SignalType.PUT)
+_STRUCTURES = (MarketStructure.RANGING, MarketStructure.BULLISH, MarketStructure.BEARISH)
+_SESSIONS = (TradingSession.OFF_HOURS, TradingSession.ASIA, TradingSession.LONDON,
+             TradingSession.NEW_YORK, TradingSession.OVERLAP)
+
+
+def _session_for_hour(hour: int) -> int:
+    """Código da sessão de trading para uma hora do dia (GMT)"""
+    # Overlap Londres/NY (melhor liquidez)
+    if 13 <= hour < 17:
+        return SESSION_OVERLAP
+    
+    # Londres
+    if 8 <= hour < 17:
+        return SESSION_LONDON
+    
+    # New York
+    if 13 <= hour < 22:
+        return SESSION_NEW_YORK
+    
+    # Asia
+    if 0 <= hour < 9:
+        return SESSION_ASIA
+    
+    return SESSION_OFF_HOURS
+
+
+# Tabelas hora (0-23) -> sessão, montadas uma vez no import
+_SESSION_CODE_BY_HOUR = tuple(_session_for_hour(hour) for hour in range(24))
+_SESSION_BY_HOUR = tuple(_SESSIONS[code] for code in _SESSION_CODE_BY_HOUR)
+
+@dataclass
+class Candle:
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+# Layout binário de um candle: timestamp int64 + OHLCV float64, little-endian (48 bytes)
+CANDLE_DTYPE = np.dtype([('ts', '<i8'), ('o', '<f8'), ('h', '<f8'), ('l', '<f8'), ('c', '<f8'), ('v', '<f8')])
+
+@dataclass
+class CandleSeries:
+    """Candles em layout SoA: um array NumPy contíguo por campo"""
+    timestamps: np.ndarray
+    opens: np.ndarray
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    volumes: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.closes)
+    
+    @classmethod
+    def from_candles(cls, candles: List[Candle]) -> "CandleSeries":
+        n = len(candles)
+        return cls(
+            timestamps=np.fromiter((c.timestamp for c in candles), dtype=np.int64, count=n),
+            opens=np.fromiter((c.open for c in candles), dtype=np.float64, count=n),
+            highs=np.fromiter((c.high for c in candles), dtype=np.float64, count=n),
+            lows=np.fromiter((c.low for c in candles), dtype=np.float64, count=n),
+            closes=np.fromiter((c.close for c in candles), dtype=np.float64, count=n),
+            volumes=np.fromiter((c.volume for c in candles), dtype=np.float64, count=n),
+        )
+    
+    @classmethod
+    def from_records(cls, records: np.ndarray) -> "CandleSeries":
+        """Série a partir de um array estruturado CANDLE_DTYPE: cada campo vira uma view, sem cópia"""
+        return cls(
+            timestamps=records['ts'],
+            opens=records['o'],
+            highs=records['h'],
+            lows=records['l'],
+            closes=records['c'],
+            volumes=records['v'],
+        )
+    
+    @classmethod
+    def from_buffer(cls, buf: bytes, n: int = -1) -> "CandleSeries":
+        """Reinterpreta candles empacotados (n registros CANDLE_DTYPE) sem criar objetos Candle"""
+        return cls.from_records(np.frombuffer(buf, dtype=CANDLE_DTYPE, count=n))
+
+class RingCandleSeries:
+    """
+    Janela deslizante de candles com capacidade fixa para o modo streaming.
+    Cada candle é gravado duas vezes (posições i e i + capacity), então os
+    últimos k candles são sempre contíguos e recent(k) devolve views sem cópia.
+    As views valem até o próximo append().
+    """
+    
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._count = 0
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        # Linhas: open, high, low, close, volume
+        self._values = np.zeros((5, 2 * capacity), dtype=np.float64)
+    
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+    
+    def append(self, candle: Candle) -> None:
+        i = self._count % self.capacity
+        j = i + self.capacity
+        self._timestamps[i] = self._timestamps[j] = candle.timestamp
+        values = self._values
+        values[0, i] = values[0, j] = candle.open
+        values[1, i] = values[1, j] = candle.high
+        values[2, i] = values[2, j] = candle.low
+        values[3, i] = values[3, j] = candle.close
+        values[4, i] = values[4, j] = candle.volume
+        self._count += 1
+    
+    def extend(self, candles: List[Candle]) -> None:
+        for candle in candles:
+            self.append(candle)
+    
+    def recent(self, k: int) -> CandleSeries:
+        """Últimos k candles (limitado ao tamanho atual) como views do buffer"""
+        k = min(k, len(self))
+        end = (self._count - 1) % self.capacity + self.capacity + 1
+        values = self._values[:, end - k:end]
+        return CandleSeries(
+            timestamps=self._timestamps[end - k:end],
+            opens=values[0],
+            highs=values[1],
+            lows=values[2],
+            closes=values[3],
+            volumes=values[4],
+        )
+
+
+def as_series(candles: Union[CandleSeries, RingCandleSeries, List[Candle]]) -> CandleSeries:
+    """Normaliza a entrada dos motores para CandleSeries (qualquer objeto com os campos de Candle serve)"""
+    if isinstance(candles, CandleSeries):
+        return candles
+    if isinstance(candles, RingCandleSeries):
+        return candles.recent(len(candles))
+    return CandleSeries.from_candles(candles)
+
+@dataclass
+class ForexSignal:
+    signal: SignalType
+    score: int
+    confidence: float
+    
+    # Níveis em PIPS
+    entry_price: float
+    stop_loss: float
+    stop_loss_pips: float
+    take_profit_1: float
+    take_profit_1_pips: float
+    take_profit_2: float
+    take_profit_2_pips: float
+    
+    # Contexto
+    market_structure: MarketStructure
+    session: TradingSession
+    trend_confirmed: bool
+    
+    # Indicadores
+    ema_50: float
+    ema_200: float
+    atr_value: float
+    
+    # Risk/Reward
+    risk_reward: float
+    
+    reasons: List[str]
+    warnings: List[str]
+    
+    # Códigos REASON_* do score (textos via format_reasons)
+    reason_codes: List[int] = field(default_factory=list)
+
+
+class ForexIndicators:
+    """Indicadores específicos para FOREX"""
+    
+    @staticmethod
+    def _smooth(seed, alpha: float, values: np.ndarray):
+        """Recorrência s = (x - s) * alpha + s sobre o último eixo de `values`, partindo de `seed`"""
+        if lfilter is not None and values.shape[-1]:
+            # y[n] = a*x[n] + (1-a)*y[n-1] numa única chamada C
+            y, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=-1,
+                           zi=np.expand_dims(seed * (1.0 - alpha), -1))
+            return y.T[-1]
+        
+        for x in np.moveaxis(values, -1, 0):
+            seed = (x - seed) * alpha + seed
+        
+        return seed
+    
+    @staticmethod
+    def true_ranges(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+        """True ranges a partir do segundo candle (último eixo = tempo)"""
+        high = highs[..., 1:]
+        low = lows[..., 1:]
+        prev_close = closes[..., :-1]
+        return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    
+    @staticmethod
+    def calculate_ema(prices: Union[np.ndarray, List[float]], period: int) -> float:
+        prices_array = np.asarray(prices, dtype=np.float64)
+        
+        if len(prices_array) < period:
+            return np.mean(prices_array)
+        
+        ema = prices_array[:period].mean()
+        multiplier = 2 / (period + 1)
+        
+        return ForexIndicators._smooth(ema, multiplier, prices_array[period:])
+    
+    @staticmethod
+    def calculate_atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                      period: int = 14) -> float:
+        if len(closes) < period:
+            return 0.0
+        
+        true_ranges = ForexIndicators.true_ranges(highs, lows, closes)
+        if len(true_ranges) <= period:
+            return true_ranges.mean()
+        
+        # Wilder (RMA): semente = média dos primeiros `period` TRs, depois alpha = 1/period
+        atr = true_ranges[:period].mean()
+        return ForexIndicators._smooth(atr, 1 / period, true_ranges[period:])
+    
+    @staticmethod
+    def calculate_ema_pair(prices: np.ndarray, fast: int, slow: int) -> Tuple[float, float]:
+        """EMAs rápida e lenta (fast < slow) calculadas numa única passada"""
+        # Com scipy (opt-in) duas chamadas lfilter batem o loop único; sem ela, segue o loop
+        if len(prices) < slow or lfilter is not None:
+            return ForexIndicators.calculate_ema(prices, fast), ForexIndicators.calculate_ema(prices, slow)
+        
+        fast_mult = 2 / (fast + 1)
+        slow_mult = 2 / (slow + 1)
+        
+        ema_fast = prices[:fast].mean()
+        for price in prices[fast:slow]:
+            ema_fast = (price - ema_fast) * fast_mult + ema_fast
+        
+        ema_slow = prices[:slow].mean()
+        for price in prices[slow:]:
+            ema_fast = (price - ema_fast) * fast_mult + ema_fast
+            ema_slow = (price - ema_slow) * slow_mult + ema_slow
+        
+        return ema_fast, ema_slow
+    
+    @staticmethod
+    def calculate_ema_batch(prices: np.ndarray, period: int) -> np.ndarray:
+        """EMA de cada linha de uma matriz (N pares x T candles), vetorizada entre pares"""
+        ema = prices[:, :period].mean(axis=1)
+        multiplier = 2 / (period + 1)
+        
+        return ForexIndicators._smooth(ema, multiplier, prices[:, period:])
+    
+    @staticmethod
+    def calculate_atr_batch(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                            period: int = 14) -> np.ndarray:
+        """ATR (Wilder) de cada linha de matrizes (N pares x T candles)"""
+        true_ranges = ForexIndicators.true_ranges(highs, lows, closes)
+        if true_ranges.shape[1] <= period:
+            return true_ranges.mean(axis=1)
+        
+        atr = true_ranges[:, :period].mean(axis=1)
+        return ForexIndicators._smooth(atr, 1 / period, true_ranges[:, period:])
+    
+    @staticmethod
+    def detect_market_structure(highs: np.ndarray, lows: np.ndarray, parts: int = 2) -> MarketStructure:
+        """
+        Detecta estrutura de mercado comparando `parts` blocos de 10 candles:
+        - BULLISH: Higher Highs + Higher Lows
+        - BEARISH: Lower Lows + Lower Highs
+        - RANGING: Sem padrão claro
+        """
+        return _STRUCTURES[_structure_code(highs, lows, parts)]
+    
+    @staticmethod
+    def get_trading_session(timestamp: int) -> TradingSession:
+        """Identifica sessão de trading (GMT)"""
+        return _SESSION_BY_HOUR[(timestamp // 3600) % 24]
+    
+    @staticmethod
+    def pips_from_price(price_diff: float, pair: str = "EUR/USD") -> float:
+        """Converte diferença de preço em pips"""
+        # Para pares com USD: 1 pip = 0.0001
+        # Para pares com JPY: 1 pip = 0.01
+        if "JPY" in pair:
+            return price_diff * 100
+        else:
+            return price_diff * 10000
+    
+    @staticmethod
+    def check_candle_confirmation(opens: np.ndarray, closes: np.ndarray, signal_type: str) -> bool:
+        """
+        Confirma direção nos últimos 2 candles
+        """
+        if len(closes) < 2:
+            return False
+        
+        if signal_type == "BULLISH":
+            # Últimos 2 candles devem fechar acima da abertura
+            return int((closes[-2:] > opens[-2:]).sum()) >= 2
+        
+        else:  # BEARISH
+            # Últimos 2 candles devem fechar abaixo da abertura
+            return int((closes[-2:] < opens[-2:]).sum()) >= 2
+
+
+@dataclass(frozen=True)
+class EngineParams:
+    """Limiares de uma versão do motor; o kernel é o mesmo para todas"""
+    min_score: int
+    atr_min_pips: float
+    
+    # Estrutura: blocos de 10 candles comparados (2 = últimos 20, 3 = últimos 30)
+    structure_parts: int = 2
+    
+    # Filtros opcionais
+    skip_asia: bool = False
+    require_candle_conf: bool = False
+    
+    # Pullback para EMA50 (distância em %)
+    pullback_ideal: Tuple[float, float] = (-0.1, 0.3)
+    pullback_ideal_pts: int = 30
+    pullback_near_max: float = 0.5
+    pullback_near_pts: int = 20
+    flag_pullback_out: bool = False
+    
+    # Pontos por sessão: (OVERLAP, LONDON, NEW_YORK)
+    session_pts: Tuple[int, int, int] = (20, 15, 15)
+    
+    # ATR em pips: faixa ideal (15 pts) e mínimo aceitável (10 pts)
+    atr_ideal: Tuple[float, float] = (15, 40)
+    atr_ok_min: float = 10
+    
+    # Distância da EMA200 pontua (10/5 pts)
+    score_ema200: bool = True
+
+
+# === KERNEL NUMÉRICO ===
+
+def _structure_code(highs: np.ndarray, lows: np.ndarray, parts: int) -> int:
+    n = parts * 10
+    if len(highs) < n:
+        return STRUCTURE_RANGING
+    
+    # Máxima/mínima de cada bloco de 10 candles, do mais antigo ao mais recente
+    h = highs[-n:].reshape(parts, 10).max(axis=1)
+    l = lows[-n:].reshape(parts, 10).min(axis=1)
+    
+    # Higher Highs + Higher Lows = BULLISH
+    if (h[1:] > h[:-1]).all() and (l[1:] > l[:-1]).all():
+        return STRUCTURE_BULLISH
+    
+    # Lower Highs + Lower Lows = BEARISH
+    if (h[1:] < h[:-1]).all() and (l[1:] < l[:-1]).all():
+        return STRUCTURE_BEARISH
+    
+    return STRUCTURE_RANGING
+
+
+def _context_kernel(highs: np.ndarray, lows: np.ndarray, timestamp: int,
+                    params: EngineParams) -> Tuple[int, int, int]:
+    """
+    Filtros categóricos (estrutura e sessão), que não dependem de EMA/ATR.
+    Retorna (structure, session, wait); wait = 0 quando todos passam.
+    """
+    structure = _structure_code(highs, lows, params.structure_parts)
+    session = _SESSION_CODE_BY_HOUR[(timestamp // 3600) % 24]
+    
+    # FILTRO: Não operar em ranging
+    if structure == STRUCTURE_RANGING:
+        return structure, session, WAIT_RANGING
+    
+    # FILTRO: Evitar sessão ASIA
+    if params.skip_asia and session == SESSION_ASIA:
+        return structure, session, WAIT_ASIA
+    
+    # FILTRO: Não operar fora das sessões principais
+    if session == SESSION_OFF_HOURS:
+        return structure, session, WAIT_OFF_HOURS
+    
+    return structure, session, 0
+
+
+def _analyze_kernel(closes: np.ndarray, opens: np.ndarray, structure: int, session: int,
+                    ema_50: float, ema_200: float, atr: float, pip_mult: float,
+                    params: EngineParams) -> tuple:
+    """
+    Filtros dependentes de EMA/ATR, score e níveis em pips usando só arrays,
+    escalares e códigos inteiros (após _context_kernel aprovar estrutura e sessão).
+    Retorna (signal, score, structure, session, wait, reasons, atr_pips,
+    distance_to_ema50, sl_pips, tp1_pips, tp2_pips); o motor monta o ForexSignal.
+    """
+    atr_pips = atr * pip_mult
+    price = closes[-1]
+    
+    # FILTRO: ATR mínimo (volatilidade)
+    if atr_pips < params.atr_min_pips:
+        return SIGNAL_WAIT, 0, structure, session, WAIT_LOW_ATR, [], atr_pips, 0.0, 0.0, 0.0, 0.0
+    
+    # FILTRO: Tendência confirmada por EMAs
+    if price > ema_50 > ema_200:
+        signal = SIGNAL_CALL
+        trend_structure = STRUCTURE_BULLISH
+        distance_to_ema50 = ((price - ema_50) / ema_50) * 100
+        distance_to_ema200 = ((price - ema_200) / ema_200) * 100
+    elif price < ema_50 < ema_200:
+        signal = SIGNAL_PUT
+        trend_structure = STRUCTURE_BEARISH
+        distance_to_ema50 = ((ema_50 - price) / ema_50) * 100
+        distance_to_ema200 = ((ema_200 - price) / ema_200) * 100
+    else:
+        return SIGNAL_WAIT, 0, structure, session, WAIT_NO_TREND, [], atr_pips, 0.0, 0.0, 0.0, 0.0
+    
+    # FILTRO: Estrutura alinhada com tendência
+    if structure != trend_structure:
+        return SIGNAL_WAIT, 0, structure, session, WAIT_MISALIGNED, [], atr_pips, 0.0, 0.0, 0.0, 0.0
+    
+    # FILTRO: Confirmação de candles (últimos 2 na direção da tendência)
+    if params.require_candle_conf:
+        if signal == SIGNAL_CALL:
+            confirmed = int((closes[-2:] > opens[-2:]).sum()) >= 2
+        else:
+            confirmed = int((closes[-2:] < opens[-2:]).sum()) >= 2
+        if not confirmed:
+            return SIGNAL_WAIT, 0, structure, session, WAIT_NO_CONFIRMATION, [], atr_pips, 0.0, 0.0, 0.0, 0.0
+    
+    # === ANÁLISE DE ENTRADA ===
+    score = 0
+    reasons = []
+    
+    # 1. Preço em pullback para EMA50
+    pullback_min, pullback_max = params.pullback_ideal
+    if pullback_min <= distance_to_ema50 <= pullback_max:
+        score += params.pullback_ideal_pts
+        reasons.append(REASON_PULLBACK_IDEAL)
+    elif pullback_max < distance_to_ema50 <= params.pullback_near_max:
+        score += params.pullback_near_pts
+        reasons.append(REASON_PULLBACK_NEAR)
+    elif params.flag_pullback_out:
+        reasons.append(REASON_PULLBACK_OUT)
+    
+    # 2. Estrutura de mercado a favor (25 pts) - já garantida pelo filtro de alinhamento
+    score += 25
+    reasons.append(REASON_STRUCTURE)
+    
+    # 3. Sessão de trading
+    overlap_pts, london_pts, new_york_pts = params.session_pts
+    if session == SESSION_OVERLAP:
+        score += overlap_pts
+        reasons.append(REASON_SESSION_OVERLAP)
+    elif session == SESSION_LONDON:
+        score += london_pts
+        reasons.append(REASON_SESSION_LONDON)
+    elif session == SESSION_NEW_YORK:
+        score += new_york_pts
+        reasons.append(REASON_SESSION_NEW_YORK)
+    
+    # 4. ATR adequado (15 pts)
+    atr_ideal_min, atr_ideal_max = params.atr_ideal
+    if atr_ideal_min <= atr_pips <= atr_ideal_max:
+        score += 15
+        reasons.append(REASON_ATR_IDEAL)
+    elif params.atr_ok_min <= atr_pips < atr_ideal_min:
+        score += 10
+        reasons.append(REASON_ATR_OK)
+    
+    # 5. Distância da EMA200 (10 pts)
+    if params.score_ema200:
+        if distance_to_ema200 > 0.5:
+            score += 10
+            reasons.append(REASON_EMA200_FAR)
+        elif distance_to_ema200 > 0:
+            score += 5
+            reasons.append(REASON_EMA200)
+    
+    # FILTRO: Score mínimo
+    if score < params.min_score:
+        return SIGNAL_WAIT, score, structure, session, WAIT_LOW_SCORE, reasons, atr_pips, distance_to_ema50, 0.0, 0.0, 0.0
+    
+    # === CALCULAR NÍVEIS EM PIPS ===
+    
+    # Stop Loss: 10-15 pips baseado em ATR
+    sl_pips = max(10, min(15, atr_pips * 1.5))
+    
+    # Take Profit 1: RR 1:2.5
+    tp1_pips = sl_pips * 2.5
+    
+    # Take Profit 2: RR 1:4
+    tp2_pips = sl_pips * 4.0
+    
+    return signal, score, structure, session, 0, reasons, atr_pips, distance_to_ema50, sl_pips, tp1_pips, tp2_pips
+
+
+def format_reasons(codes: List[int], signal_type: SignalType, distance_to_ema50: float, atr_pips: float,
+                   reason_text: Dict[int, Tuple[str, str]]) -> List[str]:
+    """Converte códigos REASON_* nos textos (CALL, PUT) de `reason_text`"""
+    side = signal_type == SignalType.PUT
+    return [
+        reason_text[code][side].format(distance=distance_to_ema50, atr_pips=atr_pips)
+        for code in codes
+    ]
+
+
+class BaseForexEngine:
+    """
+    Motor FOREX parametrizado: subclasses definem `params` e os textos
+    de WAIT (`wait_text`) e de reasons (`reason_text`)
+    """
+    
+    params: EngineParams
+    wait_text: Dict[int, str]
+    reason_text: Dict[int, Tuple[str, str]]
+    
+    def __init__(self, pair: str = "EUR/USD", verbose: bool = True):
+        self.pair = pair
+        # verbose=False pula a formatação dos textos de reasons (backtests);
+        # os códigos ficam em ForexSignal.reason_codes para describe_reasons()
+        self.verbose = verbose
+        self.indicators = ForexIndicators()
+        
+        # Conversão de pips fixa por par (1 pip = 0.01 em pares JPY, 0.0001 nos demais)
+        self._pip_mult = 100.0 if "JPY" in pair else 10000.0
+        self._pip_val = 0.01 if "JPY" in pair else 0.0001
+        
+        # Estado incremental de EMAs e ATR (Wilder) entre chamadas sequenciais de analyze()
+        self._alpha_50 = 2 / (50 + 1)
+        self._alpha_200 = 2 / (200 + 1)
+        self._alpha_atr = 1 / 14
+        # Cópias dos preços da chamada anterior: o estado só é reaproveitado se eles forem prefixo da série nova
+        self._stream_closes = None
+        self._stream_highs = None
+        self._stream_lows = None
+        self._ema_50 = 0.0
+        self._ema_200 = 0.0
+        self._atr = 0.0
+    
+    def analyze(self, candles: Union[CandleSeries, RingCandleSeries, List[Candle]]) -> ForexSignal:
+        """Análise otimizada para FOREX"""
+        
+        if len(candles) < 200:
+            return self._wait_signal("Dados insuficientes")
+        
+        series = as_series(candles)
+        
+        # Filtros baratos primeiro: EMA/ATR só são calculados se estrutura e sessão passarem
+        structure, session, wait = _context_kernel(series.highs, series.lows, int(series.timestamps[-1]), self.params)
+        if wait:
+            return self._wait_signal(self.wait_text[wait])
+        
+        # Calcular indicadores
+        ema_50, ema_200, atr = self._update_indicators(series)
+        
+        return self._evaluate(series, structure, session, ema_50, ema_200, atr)
+    
+    @classmethod
+    def analyze_batch(cls, series_by_pair: Dict[str, Union[CandleSeries, RingCandleSeries, List[Candle]]],
+                      verbose: bool = True) -> Dict[str, ForexSignal]:
+        """
+        Analisa vários pares de uma vez: séries de mesmo tamanho são empilhadas
+        em matrizes (N pares x T candles) e EMA/ATR rodam vetorizados entre os pares.
+        """
+        results = {}
+        groups: Dict[int, List[Tuple[str, CandleSeries, int, int]]] = {}
+        
+        for pair, candles in series_by_pair.items():
+            if len(candles) < 200:
+                results[pair] = cls(pair, verbose)._wait_signal("Dados insuficientes")
+                continue
+            series = as_series(candles)
+            
+            # Pares barrados pelos filtros categóricos não entram nas matrizes
+            structure, session, wait = _context_kernel(series.highs, series.lows, int(series.timestamps[-1]), cls.params)
+            if wait:
+                results[pair] = cls(pair, verbose)._wait_signal(cls.wait_text[wait])
+                continue
+            groups.setdefault(len(series), []).append((pair, series, structure, session))
+        
+        for group in groups.values():
+            closes = np.stack([series.closes for _, series, _, _ in group])
+            highs = np.stack([series.highs for _, series, _, _ in group])
+            lows = np.stack([series.lows for _, series, _, _ in group])
+            
+            ema_50 = ForexIndicators.calculate_ema_batch(closes, 50)
+            ema_200 = ForexIndicators.calculate_ema_batch(closes, 200)
+            atr = ForexIndicators.calculate_atr_batch(highs, lows, closes, 14)
+            
+            for i, (pair, series, structure, session) in enumerate(group):
+                results[pair] = cls(pair, verbose)._evaluate(series, structure, session, ema_50[i], ema_200[i], atr[i])
+        
+        return {pair: results[pair] for pair in series_by_pair}
+    
+    def _evaluate(self, series: CandleSeries, structure: int, session: int,
+                  ema_50: float, ema_200: float, atr: float) -> ForexSignal:
+        """Monta o ForexSignal a partir das primitivas do kernel numérico"""
+        (signal, score, structure, session, wait, reason_codes, atr_pips,
+         distance_to_ema50, sl_pips, tp1_pips, tp2_pips) = _analyze_kernel(
+            series.closes, series.opens, structure, session,
+            ema_50, ema_200, atr, self._pip_mult, self.params
+        )
+        
+        if signal == SIGNAL_WAIT:
+            return self._wait_signal(self.wait_text[wait].format(score=score, atr_pips=atr_pips))
+        
+        current_price = float(series.closes[-1])
+        
+        # Converter pips para preço
+        pip_value = self._pip_val
+        
+        if signal == SIGNAL_CALL:
+            stop_loss = current_price - (sl_pips * pip_value)
+            tp1 = current_price + (tp1_pips * pip_value)
+            tp2 = current_price + (tp2_pips * pip_value)
+        else:
+            stop_loss = current_price + (sl_pips * pip_value)
+            tp1 = current_price - (tp1_pips * pip_value)
+            tp2 = current_price - (tp2_pips * pip_value)
+        
+        signal_type = _SIGNALS[signal]
+        reasons = (format_reasons(reason_codes, signal_type, distance_to_ema50, atr_pips, self.reason_text)
+                   if self.verbose else [])
+        
+        return ForexSignal(
+            signal=signal_type,
+            score=score,
+            confidence=min(score / 100.0, 1.0),
+            entry_price=current_price,
+            stop_loss=stop_loss,
+            stop_loss_pips=sl_pips,
+            take_profit_1=tp1,
+            take_profit_1_pips=tp1_pips,
+            take_profit_2=tp2,
+            take_profit_2_pips=tp2_pips,
+            market_structure=_STRUCTURES[structure],
+            session=_SESSIONS[session],
+            trend_confirmed=True,
+            ema_50=ema_50,
+            ema_200=ema_200,
+            atr_value=atr,
+            risk_reward=tp1_pips / sl_pips,
+            reasons=reasons,
+            warnings=[],
+            reason_codes=reason_codes
+        )
+    
+    def describe_reasons(self, signal: ForexSignal) -> List[str]:
+        """Textos dos reasons de um sinal gerado com verbose=False"""
+        if signal.signal == SignalType.CALL:
+            distance_to_ema50 = ((signal.entry_price - signal.ema_50) / signal.ema_50) * 100
+        elif signal.signal == SignalType.PUT:
+            distance_to_ema50 = ((signal.ema_50 - signal.entry_price) / signal.ema_50) * 100
+        else:
+            return list(signal.reasons)
+        
+        return format_reasons(signal.reason_codes, signal.signal, distance_to_ema50,
+                              signal.atr_value * self._pip_mult, self.reason_text)
+    
+    def _update_indicators(self, series: CandleSeries) -> Tuple[float, float, float]:
+        """
+        EMA50/EMA200/ATR14 incrementais: se a série estende a da chamada anterior
+        (mesmos closes/highs/lows, novos candles no fim), aplica só as recorrências
+        sobre os candles novos; caso contrário recalcula do zero. Comparar os preços,
+        e não só os timestamps, cobre o último candle revisado (barra em formação)
+        e outra série com os mesmos horários.
+        """
+        closes = series.closes
+        highs = series.highs
+        lows = series.lows
+        prev_closes = self._stream_closes
+        n = 0 if prev_closes is None else len(prev_closes)
+        
+        if (n and len(closes) >= n
+                and np.array_equal(closes[:n], prev_closes)
+                and np.array_equal(highs[:n], self._stream_highs)
+                and np.array_equal(lows[:n], self._stream_lows)):
+            ema_50, ema_200, atr = self._ema_50, self._ema_200, self._atr
+            true_ranges = self.indicators.true_ranges(highs[n - 1:], lows[n - 1:], closes[n - 1:])
+            for price, tr in zip(closes[n:], true_ranges):
+                ema_50 = (price - ema_50) * self._alpha_50 + ema_50
+                ema_200 = (price - ema_200) * self._alpha_200 + ema_200
+                atr = (tr - atr) * self._alpha_atr + atr
+        else:
+            ema_50, ema_200 = self.indicators.calculate_ema_pair(closes, 50, 200)
+            atr = self.indicators.calculate_atr(highs, lows, closes, 14)
+        
+        # Cópias: views de RingCandleSeries mudam no próximo append()
+        self._stream_closes = closes.copy()
+        self._stream_highs = highs.copy()
+        self._stream_lows = lows.copy()
+        self._ema_50, self._ema_200, self._atr = ema_50, ema_200, atr
+        
+        return ema_50, ema_200, atr
+    
+    def _wait_signal(self, reason: str) -> ForexSignal:
+        """Retorna sinal de WAIT"""
+        return ForexSignal(
+            signal=SignalType.WAIT,
+            score=0,
+            confidence=0.0,
+            entry_price=0.0,
+            stop_loss=0.0,
+            stop_loss_pips=0.0,
+            take_profit_1=0.0,
+            take_profit_1_pips=0.0,
+            take_profit_2=0.0,
+            take_profit_2_pips=0.0,
+            market_structure=MarketStructure.RANGING,
+            session=TradingSession.OFF_HOURS,
+            trend_confirmed=False,
+            ema_50=0.0,
+            ema_200=0.0,
+            atr_value=0.0,
+            risk_reward=0.0,
+            reasons=[],
+            warnings=[f"⚠️ {reason}"]
+        )
@@ -11,9 +11,110 @@ import re
 import numpy as np
 import logging
 import math
+import functools
+import hashlib
+import zlib
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Signal extraction patterns (matched against the upper-cased analysis text).
+# Asset patterns are tried in priority order, each paired with a literal every
+# match must contain, so a pattern is only run when its literal is present.
+_ASSET_RES = [
+    ('/', re.compile(r'(EUR/USD|GBP/USD|USD/JPY|BTC/USD|ETH/USD)')),
+    ('USD', re.compile(r'(EURUSD|GBPUSD|USDJPY|BTCUSD|ETHUSD)')),
+    ('/', re.compile(r'([A-Z]{3}/[A-Z]{3})')),
+]
+_SL_RE = re.compile(r'STOP\s*LOSS[:\s]*(\d+[.,]\d+)')
+_TP_RE = re.compile(r'TAKE\s*PROFIT[:\s]*(\d+[.,]\d+)')
+_CONF_RE = re.compile(r'(\d+)\s*%')
+
+# Keyword tables (substring match on the upper-cased text; first hit wins
+# for pattern and strategy, in list order)
+_CALL_KEYWORDS = ('COMPRA', 'CALL', 'BUY', 'BULLISH', 'LONG', 'ALTA')
+_PUT_KEYWORDS = ('VENDA', 'PUT', 'SELL', 'BEARISH', 'SHORT', 'BAIXA')
+_PATTERN_KEYWORDS = ('REJEIÇÃO', 'REJECTION', 'BREAKOUT', 'PULLBACK', 'REVERSÃO',
+                     'REVERSAL', 'ENGULFING', 'DOJI', 'HAMMER', 'PIN BAR')
+_STRATEGY_KEYWORDS = ('COUNTER-TREND', 'TREND-FOLLOWING', 'SCALPING', 'SWING')
+
+# Encoder settings per output format. PNG ignores `quality`; zlib level 1
+# encodes ~3.5x faster than the default 6, and the run-length strategy
+# (long flat runs in chart backgrounds) keeps files smaller than level 6.
+_SAVE_OPTIONS = {
+    'PNG': {'compress_level': 1, 'compress_type': zlib.Z_RLE},
+    'JPEG': {'quality': 90},
+    'WEBP': {'quality': 85, 'method': 4},
+}
+
+
+def _normalize_format(output_format: str) -> str:
+    """Case-insensitive output format name, validated against _SAVE_OPTIONS"""
+    normalized = output_format.upper()
+    if normalized not in _SAVE_OPTIONS:
+        raise ValueError(f"Unsupported output_format {output_format!r}; "
+                         f"expected one of: {', '.join(_SAVE_OPTIONS)}")
+    return normalized
+
+
+# Scratch surface for text measurement (same mode as the annotation overlay)
+_MEASURE_DRAW = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+
+
+@functools.lru_cache(maxsize=512)
+def _text_size(text: str, font: ImageFont.FreeTypeFont) -> Tuple[int, int]:
+    """(width, height) of text's bounding box; labels repeat across scenarios"""
+    bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+@functools.lru_cache(maxsize=256)
+def _text_mask(text: str, font: ImageFont.FreeTypeFont) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Rasterize text once into an 'L' coverage mask plus its offset from the draw origin"""
+    mask, offset = font.getmask2(text, 'L')
+    image = Image.new('L', mask.size)
+    ImageDraw.Draw(image).text((-offset[0], -offset[1]), text, font=font, fill=255)
+    return image, offset
+
+
+def _draw_text(draw: ImageDraw.Draw, xy: Tuple[int, int], text: str,
+               font: ImageFont.FreeTypeFont, fill: Tuple[int, ...]) -> None:
+    """draw.text() through the glyph mask cache (same pixels; labels, shadows
+    and info lines repeat within and across scenarios)"""
+    if not isinstance(font, ImageFont.FreeTypeFont):
+        draw.text(xy, text, font=font, fill=fill)
+        return
+    mask, (dx, dy) = _text_mask(text, font)
+    draw.bitmap((xy[0] + dx, xy[1] + dy), mask, fill=fill)
+
+
+# Recently rendered annotations (LRU): a re-submitted chart with the same
+# signals skips decode, drawing and encode entirely
+_RENDER_CACHE: "OrderedDict[Tuple, bytes]" = OrderedDict()
+_RENDER_CACHE_SIZE = 16
+
+
+def _render_key(image_digest: bytes, style: Tuple, signals: Dict, operation_type: str, output_format: str) -> Tuple:
+    return image_digest, style, repr(sorted(signals.items())), operation_type, output_format
+
+
+def _cached_render(key: Tuple) -> Optional[bytes]:
+    data = _RENDER_CACHE.get(key)
+    if data is not None:
+        _RENDER_CACHE.move_to_end(key)
+    return data
+
+
+def _store_render(key: Tuple, data: bytes) -> None:
+    _RENDER_CACHE[key] = data
+    _RENDER_CACHE.move_to_end(key)
+    while len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+        _RENDER_CACHE.popitem(last=False)
+
+
+def _image_digest(image_bytes: bytes) -> bytes:
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
 
 class ChartAnnotator:
     """
@@ -21,6 +122,10 @@ class ChartAnnotator:
     Similar to ICT, SMC, Price Action educational materials
     """
     
+    # Font set shared by every instance: each TrueType face is parsed once (or the
+    # load_default fallback picked once), on first use
+    _FONTS_CACHE: Optional[Dict] = None
+    
     def __init__(self):
         # Professional color palette
         self.colors = {
@@ -56,6 +161,9 @@ class ChartAnnotator:
     
     def _load_fonts(self) -> Dict:
         """Load professional fonts with fallbacks"""
+        if ChartAnnotator._FONTS_CACHE is not None:
+            return dict(ChartAnnotator._FONTS_CACHE)
+        
         fonts = {}
         font_paths = [
             "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
@@ -74,7 +182,16 @@ class ChartAnnotator:
             default = ImageFont.load_default()
             fonts = {k: default for k in ['hero', 'title', 'label', 'sublabel', 'price', 'small']}
         
-        return fonts
+        ChartAnnotator._FONTS_CACHE = fonts
+        return dict(fonts)
+    
+    def _style_key(self) -> Tuple:
+        """Palette and font fingerprint: the render cache is shared, but instances may customise either"""
+        fonts = tuple(
+            (name, getattr(font, 'path', None) or id(font), getattr(font, 'size', None))
+            for name, font in sorted(self.fonts.items())
+        )
+        return repr(sorted(self.colors.items())), fonts
     
     def extract_trading_signals(self, analysis_text: str) -> Dict:
         """Extract trading signals from AI analysis text"""
@@ -95,12 +212,17 @@ class ChartAnnotator:
         
         text_upper = analysis_text.upper()
         
-        # Detect action (CALL/PUT)
-        call_keywords = ['COMPRA', 'CALL', 'BUY', 'BULLISH', 'LONG', 'ALTA']
-        put_keywords = ['VENDA', 'PUT', 'SELL', 'BEARISH', 'SHORT', 'BAIXA']
-        
-        call_count = sum(1 for kw in call_keywords if kw in text_upper)
-        put_count = sum(1 for kw in put_keywords if kw in text_upper)
+        # Detect action (CALL/PUT) - only the majority matters, so stop
+        # scanning PUT keywords as soon as the outcome is decided
+        call_count = sum(1 for kw in _CALL_KEYWORDS if kw in text_upper)
+        put_count = 0
+        remaining = len(_PUT_KEYWORDS)
+        for kw in _PUT_KEYWORDS:
+            if put_count > call_count or put_count + remaining < call_count:
+                break
+            remaining -= 1
+            if kw in text_upper:
+                put_count += 1
         
         if call_count > put_count:
             signals['action'] = 'CALL'
@@ -108,41 +230,33 @@ class ChartAnnotator:
             signals['action'] = 'PUT'
         
         # Extract asset
-        asset_patterns = [
-            r'(EUR/USD|GBP/USD|USD/JPY|BTC/USD|ETH/USD)',
-            r'(EURUSD|GBPUSD|USDJPY|BTCUSD|ETHUSD)',
-            r'([A-Z]{3}/[A-Z]{3})',
-        ]
-        for pattern in asset_patterns:
-            match = re.search(pattern, text_upper)
+        for literal, pattern in _ASSET_RES:
+            match = pattern.search(text_upper) if literal in text_upper else None
             if match:
                 signals['asset'] = match.group(1)
                 break
         
         # Extract prices
-        sl_match = re.search(r'STOP\s*LOSS[:\s]*(\d+[.,]\d+)', text_upper)
+        sl_match = _SL_RE.search(text_upper)
         if sl_match:
             signals['stop_loss'] = float(sl_match.group(1).replace(',', '.'))
         
-        tp_match = re.search(r'TAKE\s*PROFIT[:\s]*(\d+[.,]\d+)', text_upper)
+        tp_match = _TP_RE.search(text_upper)
         if tp_match:
             signals['take_profit'] = float(tp_match.group(1).replace(',', '.'))
         
         # Extract confidence
-        conf_match = re.search(r'(\d+)\s*%', text_upper)
+        conf_match = _CONF_RE.search(text_upper) if '%' in text_upper else None
         if conf_match:
             signals['confidence'] = int(conf_match.group(1))
         
         # Extract pattern/strategy
-        patterns = ['REJEIÇÃO', 'REJECTION', 'BREAKOUT', 'PULLBACK', 'REVERSÃO', 
-                   'REVERSAL', 'ENGULFING', 'DOJI', 'HAMMER', 'PIN BAR']
-        for p in patterns:
+        for p in _PATTERN_KEYWORDS:
             if p in text_upper:
                 signals['pattern'] = p
                 break
         
-        strategies = ['COUNTER-TREND', 'TREND-FOLLOWING', 'SCALPING', 'SWING']
-        for s in strategies:
+        for s in _STRATEGY_KEYWORDS:
             if s in text_upper:
                 signals['strategy'] = s
                 break
@@ -150,34 +264,59 @@ class ChartAnnotator:
         return signals
     
     def _apply_cinematic_overlay(self, image: Image.Image) -> Image.Image:
-        """Apply dark cinematic overlay to image"""
+        """Apply dark cinematic overlay to image (RGB images stay RGB)"""
         # Convert to RGBA
-        if image.mode != 'RGBA':
+        if image.mode not in ('RGB', 'RGBA'):
             image = image.convert('RGBA')
         
         width, height = image.size
         
-        # Create dark overlay
-        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        # The vignette outlines all lie within `band` pixels of the edges, so
+        # only the four border strips are drawn and blended (not the full frame)
+        band = int(width * 0.02) + 1
+        if 2 * band < min(width, height):
+            result = image.copy()
+            strips = [
+                (0, 0, width, band),
+                (0, height - band, width, height),
+                (0, band, band, height - band),
+                (width - band, band, width, height - band),
+            ]
+            for box in strips:
+                x1, y1, x2, y2 = box
+                tile = Image.new('RGBA', (x2 - x1, y2 - y1), (0, 0, 0, 0))
+                self._draw_vignette(ImageDraw.Draw(tile), width, height, x1, y1)
+                if result.mode == 'RGB':
+                    result.paste(tile, (x1, y1), tile)
+                else:
+                    result.paste(Image.alpha_composite(result.crop(box), tile), (x1, y1))
+        else:
+            overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+            self._draw_vignette(ImageDraw.Draw(overlay), width, height)
+            if image.mode == 'RGB':
+                result = image.copy()
+                result.paste(overlay, (0, 0), overlay)
+            else:
+                result = Image.alpha_composite(image, overlay)
+        
+        # Slightly increase contrast
+        enhancer = ImageEnhance.Contrast(result)
+        result = enhancer.enhance(1.1)
         
-        # Add subtle vignette effect (darker edges)
+        return result
+    
+    def _draw_vignette(self, draw: ImageDraw.Draw, width: int, height: int,
+                       offset_x: int = 0, offset_y: int = 0) -> None:
+        """Draw the vignette outlines (darker edges) for a width x height frame,
+        shifted by -offset so a border strip can be drawn on its own tile"""
         for i in range(50):
             alpha = int(25 * (i / 50))
             margin = int(width * 0.02 * (50 - i) / 50)
             draw.rectangle(
-                [margin, margin, width - margin, height - margin],
+                [margin - offset_x, margin - offset_y,
+                 width - margin - offset_x, height - margin - offset_y],
                 outline=(0, 0, 0, alpha)
             )
-        
-        # Composite
-        result = Image.alpha_composite(image, overlay)
-        
-        # Slightly increase contrast
-        enhancer = ImageEnhance.Contrast(result)
-        result = enhancer.enhance(1.1)
-        
-        return result
     
     def _draw_glow_rectangle(self, draw: ImageDraw.Draw, coords: List[int], 
                             color: Tuple[int, int, int], alpha: int = 45) -> None:
@@ -236,9 +375,7 @@ class ChartAnnotator:
         x, y = position
         
         # Get text dimensions
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+        text_width, text_height = _text_size(text, font)
         
         # Draw background if specified
         if bg_color:
@@ -253,9 +390,9 @@ class ChartAnnotator:
         
         # Draw text with slight shadow for depth
         shadow_offset = 2
-        draw.text((x + shadow_offset, y + shadow_offset), text, 
-                 font=font, fill=(0, 0, 0, 128))
-        draw.text((x, y), text, font=font, fill=text_color + (255,))
+        _draw_text(draw, (x + shadow_offset, y + shadow_offset), text,
+                   font, (0, 0, 0, 128))
+        _draw_text(draw, (x, y), text, font, text_color + (255,))
         
         return text_width, text_height
     
@@ -268,9 +405,7 @@ class ChartAnnotator:
         price_text = f"{price:.4f}" if price < 100 else f"{price:.2f}"
         
         # Get text dimensions
-        bbox = draw.textbbox((0, 0), price_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+        text_width, text_height = _text_size(price_text, font)
         
         padding = 8
         tag_width = text_width + padding * 2
@@ -287,11 +422,12 @@ class ChartAnnotator:
         )
         
         # Draw text
-        draw.text(
+        _draw_text(
+            draw,
             (tag_x + padding, tag_y + padding // 2),
             price_text,
-            font=font,
-            fill=self.colors['white'] + (255,)
+            font,
+            self.colors['white'] + (255,)
         )
         
         # Draw horizontal line extending to the left
@@ -301,25 +437,48 @@ class ChartAnnotator:
             width=1
         )
     
+    def _prepare_base(self, image_bytes: bytes) -> Image.Image:
+        """Decode the chart and apply the cinematic overlay (same for CALL and PUT)"""
+        # Load original image
+        original = Image.open(io.BytesIO(image_bytes))
+        
+        # RGB charts (JPEG, most screenshots) stay RGB: over an opaque base,
+        # pasting through the overlay's alpha gives exactly the pixels of
+        # alpha_composite + convert('RGB'), with one channel less to move
+        if original.mode != 'RGB':
+            original = original.convert('RGBA')
+        
+        # Apply cinematic overlay to original
+        return self._apply_cinematic_overlay(original)
+    
     def create_professional_annotation(self, 
                                        image_bytes: bytes, 
                                        signals: Dict,
-                                       operation_type: str = 'CALL') -> bytes:
+                                       operation_type: str = 'CALL',
+                                       output_format: str = 'PNG') -> bytes:
         """
         Create a professional, institutional-grade trading chart annotation
         Style: ICT/SMC/Price Action Educational Materials
+        output_format: 'PNG' (lossless), 'JPEG' or 'WEBP' (much smaller payloads), case-insensitive
         """
-        # Load original image
-        original = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert to RGBA
-        if original.mode != 'RGBA':
-            original = original.convert('RGBA')
-        
-        width, height = original.size
-        
-        # Apply cinematic overlay to original
-        base_image = self._apply_cinematic_overlay(original)
+        output_format = _normalize_format(output_format)
+        key = _render_key(_image_digest(image_bytes), self._style_key(), signals, operation_type, output_format)
+        data = _cached_render(key)
+        if data is None:
+            data = self.create_professional_annotation_from_base(
+                self._prepare_base(image_bytes), signals, operation_type, output_format
+            )
+            _store_render(key, data)
+        return data
+    
+    def create_professional_annotation_from_base(self,
+                                                 base_image: Image.Image,
+                                                 signals: Dict,
+                                                 operation_type: str = 'CALL',
+                                                 output_format: str = 'PNG') -> bytes:
+        """Annotate an already prepared base image (see _prepare_base); base_image is not modified"""
+        output_format = _normalize_format(output_format)
+        width, height = base_image.size
         
         # Create overlay for annotations
         overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
@@ -460,8 +619,7 @@ class ChartAnnotator:
             title_text = f"{operation_type} Setup - {asset}"
         
         # Draw title at top center
-        bbox = draw.textbbox((0, 0), title_text, font=self.fonts['title'])
-        title_width = bbox[2] - bbox[0]
+        title_width = _text_size(title_text, self.fonts['title'])[0]
         title_x = (width - title_width) // 2
         title_y = 15
         
@@ -472,23 +630,28 @@ class ChartAnnotator:
         )
         
         # Title text
-        draw.text(
+        _draw_text(
+            draw,
             (title_x, title_y),
             title_text,
-            font=self.fonts['title'],
-            fill=entry_color + (255,)
+            self.fonts['title'],
+            entry_color + (255,)
         )
         
         # === DRAW INFO BOX (Bottom Left) ===
         self._draw_info_box(draw, width, height, signals, operation_type)
         
         # === COMPOSITE FINAL IMAGE ===
-        result = Image.alpha_composite(base_image, overlay)
-        result = result.convert('RGB')
+        if base_image.mode == 'RGB':
+            result = base_image.copy()
+            result.paste(overlay, (0, 0), overlay)
+        else:
+            result = Image.alpha_composite(base_image, overlay)
+            result = result.convert('RGB')
         
         # Save to bytes
         output = io.BytesIO()
-        result.save(output, format='PNG', quality=95)
+        result.save(output, format=output_format, **_SAVE_OPTIONS[output_format])
         return output.getvalue()
     
     def _draw_info_box(self, draw: ImageDraw.Draw, 
@@ -522,8 +685,7 @@ class ChartAnnotator:
         max_width = 0
         for label, value, _ in lines:
             text = f"{label} {value}"
-            bbox = draw.textbbox((0, 0), text, font=self.fonts['small'])
-            max_width = max(max_width, bbox[2] - bbox[0])
+            max_width = max(max_width, _text_size(text, self.fonts['small'])[0])
         
         box_width = max_width + padding * 2 + 20
         box_height = len(lines) * line_height + padding * 2
@@ -542,52 +704,93 @@ class ChartAnnotator:
         # Draw lines
         current_y = y + padding
         for label, value, color in lines:
-            draw.text(
+            _draw_text(
+                draw,
                 (x + padding, current_y),
                 label,
-                font=self.fonts['small'],
-                fill=self.colors['gray_medium'] + (255,)
+                self.fonts['small'],
+                self.colors['gray_medium'] + (255,)
             )
             
             # Get label width to position value
-            bbox = draw.textbbox((0, 0), label, font=self.fonts['small'])
-            label_width = bbox[2] - bbox[0]
+            label_width = _text_size(label, self.fonts['small'])[0]
             
-            draw.text(
+            _draw_text(
+                draw,
                 (x + padding + label_width + 8, current_y),
                 value,
-                font=self.fonts['small'],
-                fill=color + (255,)
+                self.fonts['small'],
+                color + (255,)
             )
             current_y += line_height
     
     def annotate_chart(self, image_bytes: bytes, analysis_text: str, 
-                      signals: Optional[Dict] = None) -> bytes:
-        """Main method to annotate a chart based on AI analysis"""
+                      signals: Optional[Dict] = None,
+                      output_format: str = 'PNG') -> bytes:
+        """
+        Main method to annotate a chart based on AI analysis
+        Without a CALL/PUT signal there is nothing to draw: the original bytes are
+        returned if already in output_format, otherwise re-encoded (RGB) into it
+        """
+        output_format = _normalize_format(output_format)
         if signals is None:
             signals = self.extract_trading_signals(analysis_text)
         
         action = signals.get('action', 'CALL')
-        return self.create_professional_annotation(image_bytes, signals, action)
+        if action not in ('CALL', 'PUT'):
+            # Image.open only parses the header, so the passthrough check stays cheap
+            image = Image.open(io.BytesIO(image_bytes))
+            if image.format == output_format:
+                return image_bytes
+            output = io.BytesIO()
+            image.convert('RGB').save(output, format=output_format, **_SAVE_OPTIONS[output_format])
+            return output.getvalue()
+        return self.create_professional_annotation(image_bytes, signals, action, output_format)
     
     def generate_both_scenarios(self, image_bytes: bytes, 
-                               analysis_text: str) -> Tuple[bytes, bytes]:
+                               analysis_text: str,
+                               signals: Optional[Dict] = None,
+                               output_format: str = 'PNG') -> Tuple[bytes, bytes]:
         """Generate both CALL and PUT scenario images"""
-        signals = self.extract_trading_signals(analysis_text)
-        
-        call_image = self.create_professional_annotation(image_bytes, signals, 'CALL')
-        put_image = self.create_professional_annotation(image_bytes, signals, 'PUT')
+        output_format = _normalize_format(output_format)
+        if signals is None:
+            signals = self.extract_trading_signals(analysis_text)
         
+        digest = _image_digest(image_bytes)
+        style = self._style_key()
+        images = []
+        base_image = None
+        for operation_type in ('CALL', 'PUT'):
+            key = _render_key(digest, style, signals, operation_type, output_format)
+            data = _cached_render(key)
+            if data is None:
+                # Decode and darken the chart once, draw each scenario on top of it
+                if base_image is None:
+                    base_image = self._prepare_base(image_bytes)
+                data = self.create_professional_annotation_from_base(base_image, signals, operation_type, output_format)
+                _store_render(key, data)
+            images.append(data)
+        
+        call_image, put_image = images
         return call_image, put_image
 
 
+# Shared annotator for the convenience functions (holds no per-call state)
+_ANNOTATOR = None
+
+
+def _get_annotator() -> ChartAnnotator:
+    global _ANNOTATOR
+    if _ANNOTATOR is None:
+        _ANNOTATOR = ChartAnnotator()
+    return _ANNOTATOR
+
+
 def create_annotated_chart(image_bytes: bytes, analysis_text: str) -> bytes:
     """Convenience function to create annotated chart"""
-    annotator = ChartAnnotator()
-    return annotator.annotate_chart(image_bytes, analysis_text)
+    return _get_annotator().annotate_chart(image_bytes, analysis_text)
 
 
 def create_both_scenarios(image_bytes: bytes, analysis_text: str) -> Tuple[bytes, bytes]:
     """Convenience function to create both CALL and PUT scenarios"""
-    annotator = ChartAnnotator()
-    return annotator.generate_both_scenarios(image_bytes, analysis_text)
+    return _get_annotator().generate_both_scenarios(image_bytes, analysis_text)
@@ -4,9 +4,10 @@ Sistema específico para timeframes curtos com alta taxa de acerto
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
+from forex_core import CandleSeries, RingCandleSeries, as_series
 
 class SignalType(Enum):
     CALL = "CALL"
@@ -14,7 +15,7 @@ class SignalType(Enum):
     WAIT = "WAIT"
 
 
-@dataclass
+@dataclass(slots=True)
 class Candle:
     timestamp: int
     open: float
@@ -50,14 +51,16 @@ class ScalpingIndicators:
     
     @staticmethod
     def calculate_ema(prices: List[float], period: int) -> float:
-        if len(prices) < period:
-            return np.mean(prices)
+        prices_array = np.asarray(prices, dtype=np.float64)
+        
+        if len(prices_array) < period:
+            return np.mean(prices_array)
         
-        prices_array = np.array(prices)
-        ema = prices_array[:period].mean()
+        ema = float(prices_array[:period].mean())
         multiplier = 2 / (period + 1)
         
-        for price in prices_array[period:]:
+        # Recorrência sobre floats nativos: iterar escalares NumPy custa ~4x mais por candle
+        for price in prices_array[period:].tolist():
             ema = (price - ema) * multiplier + ema
         
         return ema
@@ -67,13 +70,27 @@ class ScalpingIndicators:
         if len(prices) < period + 1:
             return 50.0
         
+        avg_gain, avg_loss = ScalpingIndicators.wilder_averages(prices, period)
+        return ScalpingIndicators.rsi_from_averages(avg_gain, avg_loss)
+    
+    @staticmethod
+    def wilder_averages(prices: List[float], period: int = 14) -> Tuple[float, float]:
+        """Médias de ganhos e perdas do RSI (Wilder): semente = média simples dos primeiros `period`"""
         deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
+        
+        avg_gain = float(gains[:period].mean())
+        avg_loss = float(losses[:period].mean())
         
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        for gain, loss in zip(gains[period:].tolist(), losses[period:].tolist()):
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
         
+        return avg_gain, avg_loss
+    
+    @staticmethod
+    def rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
         if avg_loss == 0:
             return 100.0
         
@@ -96,11 +113,11 @@ class ScalpingIndicators:
         if len(prices) < 10:
             return "UNCLEAR"
         
-        recent_prices = prices[-10:]
+        recent_prices = np.asarray(prices[-5:])
         
         # Contar quantos closes estão acima/abaixo das EMAs
-        above_9 = sum(1 for p in recent_prices[-5:] if p > ema_9)
-        below_9 = sum(1 for p in recent_prices[-5:] if p < ema_9)
+        above_9 = np.count_nonzero(recent_prices > ema_9)
+        below_9 = np.count_nonzero(recent_prices < ema_9)
         
         # Verificar alinhamento de EMAs
         ema_aligned_up = ema_9 > ema_21
@@ -116,44 +133,46 @@ class ScalpingIndicators:
             return "RANGING"
     
     @staticmethod
-    def calculate_atr_fast(candles: List[Candle], period: int = 7) -> float:
+    def calculate_atr_fast(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 7) -> float:
         """ATR rápido para scalping"""
-        if len(candles) < period:
+        if len(closes) < period:
             return 0.0
         
-        true_ranges = []
-        for i in range(1, len(candles)):
-            high = candles[i].high
-            low = candles[i].low
-            prev_close = candles[i-1].close
-            
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            true_ranges.append(tr)
+        # Só os últimos `period` true ranges entram na média: basta a cauda de period + 1 candles,
+        # pequena o bastante para que floats nativos saiam mais baratos que operações NumPy
+        start = -period - 1
+        tail_highs = highs[start:].tolist()
+        tail_lows = lows[start:].tolist()
+        tail_closes = closes[start:].tolist()
+        
+        total = 0.0
+        for high, low, prev_close in zip(tail_highs[1:], tail_lows[1:], tail_closes):
+            total += max(high - low, abs(high - prev_close), abs(low - prev_close))
         
-        return np.mean(true_ranges[-period:])
+        return total / (len(tail_closes) - 1)
     
     @staticmethod
-    def detect_volatility_spike(candles: List[Candle]) -> bool:
+    def detect_volatility_spike(highs: np.ndarray, lows: np.ndarray) -> bool:
         """Detecta spike de volatilidade (evitar)"""
-        if len(candles) < 20:
+        if len(highs) < 20:
             return False
         
-        recent_ranges = [(c.high - c.low) for c in candles[-10:]]
-        avg_range = np.mean([(c.high - c.low) for c in candles[-20:-10]])
-        
-        current_range = candles[-1].high - candles[-1].low
+        # Um único vetor de ranges para os 20 candles; sum() / n é o mesmo valor de mean()
+        # sem o overhead que np.mean tem em arrays pequenos
+        ranges = highs[-20:] - lows[-20:]
+        avg_range = ranges[:10].sum() / 10
         
         # Spike se atual é 2x a média
-        return current_range > avg_range * 2.0
+        return ranges[-1] > avg_range * 2.0
     
     @staticmethod
-    def check_volume_surge(candles: List[Candle]) -> float:
+    def check_volume_surge(volumes: np.ndarray) -> float:
         """Ratio de volume atual vs média"""
-        if len(candles) < 20:
+        if len(volumes) < 20:
             return 1.0
         
-        avg_volume = np.mean([c.volume for c in candles[-20:-1]])
-        current_volume = candles[-1].volume
+        avg_volume = volumes[-20:-1].sum() / 19
+        current_volume = volumes[-1]
         
         if avg_volume == 0:
             return 1.0
@@ -170,39 +189,33 @@ class ScalpingEngine:
     
     def __init__(self):
         self.indicators = ScalpingIndicators()
+        
+        # Estado incremental de EMA9/EMA21 e das médias do RSI (Wilder) entre chamadas sequenciais de analyze()
+        self._alpha_9 = 2 / (9 + 1)
+        self._alpha_21 = 2 / (21 + 1)
+        self._rsi_period = 14
+        # Cópia dos closes da chamada anterior: o estado só é reaproveitado se eles forem prefixo da série nova
+        self._stream_closes = None
+        self._ema_9 = 0.0
+        self._ema_21 = 0.0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
     
-    def analyze(self, candles: List[Candle], capital: float = 10000.0) -> ScalpSignal:
+    def analyze(self, candles: Union[CandleSeries, RingCandleSeries, List[Candle]],
+                capital: float = 10000.0) -> ScalpSignal:
         """Análise para scalping em 5min"""
         
         if len(candles) < 50:
             return self._wait_signal("Dados insuficientes")
         
-        closes = [c.close for c in candles]
-        current_price = candles[-1].close
+        # Layout SoA: cada indicador lê arrays contíguos em vez de atributos de Candle.
+        # Em streaming, um RingCandleSeries mantém a janela sem realocar a cada candle novo
+        series = as_series(candles)
+        current_price = float(series.closes[-1])
         
-        # Indicadores RÁPIDOS
-        ema_9 = self.indicators.calculate_ema(closes, 9)
-        ema_21 = self.indicators.calculate_ema(closes, 21)
-        rsi = self.indicators.calculate_rsi(closes, 14)
-        momentum = self.indicators.calculate_momentum(closes, 10)
-        atr = self.indicators.calculate_atr_fast(candles, 7)
-        
-        # Detectores
-        micro_trend = self.indicators.detect_micro_trend(closes, ema_9, ema_21)
-        volatility_spike = self.indicators.detect_volatility_spike(candles)
-        volume_ratio = self.indicators.check_volume_surge(candles)
-        
-        # FILTRO CRÍTICO 1: Não operar em volatilidade extrema
-        if volatility_spike:
-            return self._wait_signal("Volatilidade extrema detectada")
-        
-        # FILTRO CRÍTICO 2: Volume mínimo
-        if volume_ratio < 0.8:
-            return self._wait_signal("Volume muito baixo")
-        
-        # FILTRO CRÍTICO 3: Apenas em micro trends claros
-        if micro_trend == "RANGING":
-            return self._wait_signal("Mercado sem direção clara")
+        wait, ema_9, ema_21, rsi, momentum, atr, micro_trend, volume_ratio = self._compute_features(series)
+        if wait:
+            return self._wait_signal(wait)
         
         # Inicializar
         score = 0
@@ -246,7 +259,8 @@ class ScalpingEngine:
         
         confidence = min(score / 100.0, 1.0)
         
-        volatility_level = "HIGH" if volatility_spike else "NORMAL"
+        # Spikes de volatilidade já viram WAIT em _compute_features
+        volatility_level = "NORMAL"
         
         return ScalpSignal(
             signal=signal_type,
@@ -265,6 +279,76 @@ class ScalpingEngine:
             warnings=warnings
         )
     
+    def _compute_features(self, series: CandleSeries) -> Tuple[str, float, float, float, float, float, str, float]:
+        """
+        Indicadores e detectores de uma janela, na ordem dos filtros críticos:
+        spike e volume só leem os últimos 20 candles e rodam antes das EMAs;
+        RSI, momentum e ATR só são calculados se houver micro trend.
+        Retorna (wait, ema_9, ema_21, rsi, momentum, atr, micro_trend, volume_ratio),
+        com wait = motivo do WAIT ou "" se a janela passou pelos filtros.
+        """
+        closes = series.closes
+        highs = series.highs
+        lows = series.lows
+        
+        # FILTRO CRÍTICO 1: Não operar em volatilidade extrema
+        if self.indicators.detect_volatility_spike(highs, lows):
+            return "Volatilidade extrema detectada", 0.0, 0.0, 50.0, 0.0, 0.0, "UNCLEAR", 0.0
+        
+        # FILTRO CRÍTICO 2: Volume mínimo
+        volume_ratio = self.indicators.check_volume_surge(series.volumes)
+        if volume_ratio < 0.8:
+            return "Volume muito baixo", 0.0, 0.0, 50.0, 0.0, 0.0, "UNCLEAR", volume_ratio
+        
+        # Indicadores RÁPIDOS
+        ema_9, ema_21, avg_gain, avg_loss = self._update_indicators(series)
+        
+        # FILTRO CRÍTICO 3: Apenas em micro trends claros
+        micro_trend = self.indicators.detect_micro_trend(closes, ema_9, ema_21)
+        if micro_trend == "RANGING":
+            return "Mercado sem direção clara", ema_9, ema_21, 50.0, 0.0, 0.0, micro_trend, volume_ratio
+        
+        rsi = self.indicators.rsi_from_averages(avg_gain, avg_loss)
+        momentum = self.indicators.calculate_momentum(closes, 10)
+        atr = self.indicators.calculate_atr_fast(highs, lows, closes, 7)
+        
+        return "", ema_9, ema_21, rsi, momentum, atr, micro_trend, volume_ratio
+    
+    def _update_indicators(self, series: CandleSeries) -> Tuple[float, float, float, float]:
+        """
+        EMA9/EMA21 e médias do RSI14 incrementais: se a série estende a da chamada anterior
+        (mesmos closes, novos candles no fim), aplica só as recorrências sobre os
+        candles novos; caso contrário recalcula do zero. Comparar os closes, e não só
+        os timestamps, cobre o último candle revisado e outra série com os mesmos horários.
+        """
+        closes = series.closes
+        prev_closes = self._stream_closes
+        n = 0 if prev_closes is None else len(prev_closes)
+        
+        if n and len(closes) >= n and np.array_equal(closes[:n], prev_closes):
+            ema_9, ema_21 = self._ema_9, self._ema_21
+            avg_gain, avg_loss = self._avg_gain, self._avg_loss
+            period = self._rsi_period
+            prev_price = closes[n - 1].item()
+            for price in closes[n:].tolist():
+                ema_9 = (price - ema_9) * self._alpha_9 + ema_9
+                ema_21 = (price - ema_21) * self._alpha_21 + ema_21
+                delta = price - prev_price
+                avg_gain = (avg_gain * (period - 1) + max(delta, 0.0)) / period
+                avg_loss = (avg_loss * (period - 1) + max(-delta, 0.0)) / period
+                prev_price = price
+        else:
+            ema_9 = self.indicators.calculate_ema(closes, 9)
+            ema_21 = self.indicators.calculate_ema(closes, 21)
+            avg_gain, avg_loss = self.indicators.wilder_averages(closes, self._rsi_period)
+        
+        # Cópia: views de RingCandleSeries mudam no próximo append()
+        self._stream_closes = closes.copy()
+        self._ema_9, self._ema_21 = ema_9, ema_21
+        self._avg_gain, self._avg_loss = avg_gain, avg_loss
+        
+        return ema_9, ema_21, avg_gain, avg_loss
+    
     def _analyze_scalp_long(self, price: float, ema9: float, ema21: float,
                            rsi: float, momentum: float, vol_ratio: float) -> Tuple[SignalType, int, List[str]]:
         """Análise de scalp LONG (CALL)"""
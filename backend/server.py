@@ -348,7 +348,7 @@ Responda SEMPRE em português brasileiro de forma profissional e detalhada."""
             signals = annotator.extract_trading_signals(ai_response)
             
             # Always generate both CALL and PUT scenario images
-            call_bytes, put_bytes = annotator.generate_both_scenarios(image_bytes, ai_response)
+            call_bytes, put_bytes = annotator.generate_both_scenarios(image_bytes, ai_response, signals)
             
             # Save CALL annotated image
             call_filename = f"{image_id}_call.png"
@@ -547,7 +547,7 @@ Responda SEMPRE em português brasileiro de forma profissional."""
             # Generate both scenarios for each image
             for idx, (img_bytes, img_id) in enumerate(zip(original_image_bytes, image_ids)):
                 try:
-                    call_bytes, put_bytes = annotator.generate_both_scenarios(img_bytes, ai_response)
+                    call_bytes, put_bytes = annotator.generate_both_scenarios(img_bytes, ai_response, signals)
                     
                     # Save CALL annotated image
                     call_filename = f"{img_id}_call.png"
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os módulos do backend se importam pelo nome (from forex_core import ...)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
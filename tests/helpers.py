@@ -0,0 +1,53 @@
+"""Dados sintéticos compartilhados pelos testes"""
+
+import dataclasses
+import random
+
+import pytest
+
+from forex_core import Candle, CandleSeries
+
+
+def generate_ohlcv(n, seed, price=1.08, step=3600, vol_scale=0.0012):
+    """Candles sintéticos (timestamp, open, high, low, close, volume) com tendências alternadas"""
+    rnd = random.Random(seed)
+    scale = price * vol_scale
+    ts = 1_700_000_000 - (1_700_000_000 % step)
+    out = []
+    drift = 0.0
+    for i in range(n):
+        if i % 60 == 0:
+            drift = rnd.choice([-1, 0, 1]) * scale * rnd.uniform(0.1, 0.5)
+        o = price
+        c = o + drift + rnd.gauss(0, scale)
+        h = max(o, c) + abs(rnd.gauss(0, scale * 0.5))
+        l = min(o, c) - abs(rnd.gauss(0, scale * 0.5))
+        out.append((ts + i * step, o, h, l, c, 1000 + rnd.random() * 800))
+        price = c
+    return out
+
+
+def scalp_rows(n, seed):
+    """Candles de 5 minutos com a volatilidade menor do scalping"""
+    return generate_ohlcv(n, seed, step=300, vol_scale=0.0008)
+
+
+def candles(rows, candle_cls=Candle):
+    return [candle_cls(*row) for row in rows]
+
+
+def assert_same_signal(actual, expected, rel=1e-9, abs=1e-12):
+    """Compara campo a campo; floats com tolerância (rel=abs=0 exige igualdade exata)"""
+    a, b = dataclasses.asdict(actual), dataclasses.asdict(expected)
+    for key, value in b.items():
+        if isinstance(value, float):
+            assert a[key] == pytest.approx(value, rel=rel, abs=abs), key
+        else:
+            assert a[key] == value, key
+
+
+def assert_same_indicators(engine, rows, rel=1e-9, abs=1e-12):
+    """Estado incremental do motor reutilizado == cálculo do zero num motor novo"""
+    actual = engine._update_indicators(CandleSeries.from_candles(rows))
+    expected = type(engine)()._update_indicators(CandleSeries.from_candles(rows))
+    assert actual == pytest.approx(expected, rel=rel, abs=abs)
@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+import pytest
+
+import forex_core
+import scalping_engine
+from tests.helpers import assert_same_indicators, assert_same_signal, candles, generate_ohlcv, scalp_rows
+from forex_engine_v2 import ForexEngine
+from forex_engine_v3_optimized import OptimizedForexEngine
+from scalping_engine import ScalpingEngine
+
+# make_rows gera os candles; warmup = barras mínimas para o motor sair do WAIT por falta de dados
+EngineCase = namedtuple("EngineCase", "engine_cls candle_cls make_rows warmup tolerance")
+
+CASES = [
+    pytest.param(EngineCase(ForexEngine, forex_core.Candle, generate_ohlcv, 200, (1e-9, 1e-12)), id="v2"),
+    pytest.param(EngineCase(OptimizedForexEngine, forex_core.Candle, generate_ohlcv, 200, (1e-9, 1e-12)), id="v3"),
+    # Scalping só usa operações exatas sobre o mesmo prefixo: exige igualdade bit a bit
+    pytest.param(EngineCase(ScalpingEngine, scalping_engine.Candle, scalp_rows, 50, (0, 0)), id="scalping"),
+]
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_stream_matches_cold_engine(case):
+    rows = case.make_rows(case.warmup + 350, seed=1)
+    engine = case.engine_cls()
+    for end in range(case.warmup, len(rows), 5):
+        window = candles(rows[:end], case.candle_cls)
+        assert_same_signal(engine.analyze(window), case.engine_cls().analyze(window), *case.tolerance)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_stream_state_not_reused_for_other_prices_same_timestamps(case):
+    engine = case.engine_cls()
+    for seed in range(40):
+        # Mesmos timestamps, preços diferentes a cada chamada
+        rows = candles(case.make_rows(case.warmup + 60, seed=seed), case.candle_cls)
+        assert_same_signal(engine.analyze(rows), case.engine_cls().analyze(rows), *case.tolerance)
+        assert_same_indicators(engine, rows, *case.tolerance)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_stream_state_not_reused_when_last_bar_is_revised(case):
+    rows = case.make_rows(case.warmup + 100, seed=3)
+    engine = case.engine_cls()
+    for end in range(case.warmup + 20, len(rows), 4):
+        window = rows[:end]
+        engine.analyze(candles(window, case.candle_cls))
+        # Barra em formação: mesmo timestamp, preços revisados
+        ts, o, h, l, c, v = window[-1]
+        revised = candles(window[:-1] + [(ts, o, h * 1.002, l, c * 1.0015, v)], case.candle_cls)
+        assert_same_signal(engine.analyze(revised), case.engine_cls().analyze(revised), *case.tolerance)
+        assert_same_indicators(engine, revised, *case.tolerance)
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+import forex_core
+from tests.helpers import assert_same_signal, candles, generate_ohlcv
+from forex_core import CANDLE_DTYPE, CandleSeries, ForexIndicators, RingCandleSeries
+from forex_engine_v2 import ForexEngine
+from forex_engine_v3_optimized import OptimizedForexEngine
+
+ENGINES = [ForexEngine, OptimizedForexEngine]
+
+
+def wilder_atr_reference(rows, period=14):
+    """ATR de Wilder em Python puro: semente = média simples dos primeiros `period` TRs"""
+    if len(rows) < period:
+        return 0.0
+    true_ranges = []
+    for prev, cur in zip(rows, rows[1:]):
+        high, low, prev_close = cur[2], cur[3], prev[4]
+        true_ranges.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+    if len(true_ranges) <= period:
+        return sum(true_ranges) / len(true_ranges)
+    atr = sum(true_ranges[:period]) / period
+    for tr in true_ranges[period:]:
+        atr = (atr * (period - 1) + tr) / period
+    return atr
+
+
+@pytest.fixture(params=["lfilter", "loop"])
+def smooth_path(request, monkeypatch):
+    """Roda o teste nos dois caminhos de ForexIndicators._smooth"""
+    if request.param == "lfilter":
+        if forex_core.lfilter is None:
+            pytest.skip("scipy não instalada")
+    else:
+        monkeypatch.setattr(forex_core, "lfilter", None)
+    return request.param
+
+
+@pytest.mark.parametrize("n", [10, 14, 15, 30, 250])
+def test_calculate_atr_matches_wilder_reference(smooth_path, n):
+    rows = generate_ohlcv(n, seed=n)
+    series = CandleSeries.from_candles(candles(rows))
+    atr = ForexIndicators.calculate_atr(series.highs, series.lows, series.closes, 14)
+    assert atr == pytest.approx(wilder_atr_reference(rows), rel=1e-12)
+
+
+def test_calculate_atr_batch_matches_wilder_reference(smooth_path):
+    rows_by_pair = [generate_ohlcv(220, seed=seed) for seed in range(5)]
+    series = [CandleSeries.from_candles(candles(rows)) for rows in rows_by_pair]
+    atr = ForexIndicators.calculate_atr_batch(
+        np.stack([s.highs for s in series]), np.stack([s.lows for s in series]), np.stack([s.closes for s in series])
+    )
+    assert atr == pytest.approx([wilder_atr_reference(rows) for rows in rows_by_pair], rel=1e-12)
+
+
+def test_smooth_paths_agree(monkeypatch):
+    if forex_core.lfilter is None:
+        pytest.skip("scipy não instalada")
+    values = np.random.default_rng(0).normal(1.08, 0.01, size=(3, 300))
+    seed = values[:, :14].mean(axis=1)
+    with_lfilter = ForexIndicators._smooth(seed, 1 / 14, values[:, 14:])
+    monkeypatch.setattr(forex_core, "lfilter", None)
+    with_loop = ForexIndicators._smooth(seed, 1 / 14, values[:, 14:])
+    assert with_lfilter == pytest.approx(with_loop, rel=1e-12)
+
+
+@pytest.mark.parametrize("engine_cls", ENGINES)
+def test_streaming_atr_matches_wilder_reference(smooth_path, engine_cls):
+    rows = generate_ohlcv(500, seed=7)
+    engine = engine_cls()
+    for end in range(200, len(rows), 11):
+        _, _, atr = engine._update_indicators(CandleSeries.from_candles(candles(rows[:end])))
+        assert atr == pytest.approx(wilder_atr_reference(rows[:end]), rel=1e-9)
+
+
+@pytest.mark.parametrize("engine_cls", ENGINES)
+def test_wait_signals_do_not_share_lists(engine_cls):
+    engine = engine_cls()
+    first = engine.analyze(candles(generate_ohlcv(50, seed=0)))
+    first.reasons.append("x")
+    first.reason_codes.append(1)
+    second = engine.analyze(candles(generate_ohlcv(50, seed=0)))
+    assert second.signal.value == "WAIT"
+    assert second.reasons == [] and second.reason_codes == []
+    assert second.warnings == ["⚠️ Dados insuficientes"]
+    assert second.warnings is not first.warnings
+
+
+@pytest.mark.parametrize("capacity,n", [(50, 10), (50, 50), (50, 51), (50, 173), (7, 7 * 5 + 3)])
+def test_ring_recent_matches_trailing_slice(capacity, n):
+    rows = candles(generate_ohlcv(n, seed=n))
+    ring = RingCandleSeries(capacity)
+    ring.extend(rows)
+    expected = CandleSeries.from_candles(rows)
+    for k in (1, capacity // 2, capacity):
+        recent = ring.recent(k)
+        k = min(k, n)
+        assert len(recent) == k
+        for name in ("timestamps", "opens", "highs", "lows", "closes", "volumes"):
+            np.testing.assert_array_equal(getattr(recent, name), getattr(expected, name)[n - k:])
+
+
+def test_ring_len_before_and_after_filling():
+    ring = RingCandleSeries(20)
+    assert len(ring) == 0
+    for i, candle in enumerate(candles(generate_ohlcv(45, seed=0)), start=1):
+        ring.append(candle)
+        assert len(ring) == min(i, 20)
+
+
+def test_ring_recent_larger_than_len_returns_everything():
+    rows = candles(generate_ohlcv(12, seed=2))
+    ring = RingCandleSeries(30)
+    ring.extend(rows)
+    recent = ring.recent(100)
+    assert len(recent) == 12
+    np.testing.assert_array_equal(recent.closes, CandleSeries.from_candles(rows).closes)
+
+
+@pytest.mark.parametrize("verbose", [True, False])
+@pytest.mark.parametrize("engine_cls", ENGINES)
+def test_analyze_batch_matches_per_pair_analyze(engine_cls, verbose):
+    # Tamanhos repetidos formam grupos empilhados; 150 candles cai no WAIT por dados insuficientes
+    series_by_pair = {}
+    for seed in range(24):
+        pair = f"PAIR{seed}/JPY" if seed % 5 == 0 else f"PAIR{seed}/USD"
+        price = 150.0 if pair.endswith("JPY") else 1.08
+        n = (150, 250, 300, 330)[seed % 4]
+        series_by_pair[pair] = candles(generate_ohlcv(n, seed=seed, price=price))
+    results = engine_cls.analyze_batch(series_by_pair, verbose=verbose)
+    assert list(results) == list(series_by_pair)
+    for pair, rows in series_by_pair.items():
+        assert_same_signal(results[pair], engine_cls(pair, verbose).analyze(rows))
+
+
+@pytest.mark.parametrize("engine_cls", ENGINES)
+def test_from_buffer_matches_candle_list(engine_cls):
+    for seed in range(12):
+        rows = generate_ohlcv(260, seed=seed)
+        buf = np.array([tuple(row) for row in rows], dtype=CANDLE_DTYPE).tobytes()
+        series = CandleSeries.from_buffer(buf)
+        assert len(series) == len(rows)
+        assert_same_signal(engine_cls().analyze(series), engine_cls().analyze(candles(rows)))
@@ -0,0 +1,109 @@
+import io
+from collections import OrderedDict
+
+import pytest
+from PIL import Image, ImageFont
+
+import image_annotator
+from image_annotator import ChartAnnotator
+
+SIGNALS = {'action': 'CALL', 'asset': 'EUR/USD', 'stop_loss': 1.0820, 'take_profit': 1.0910, 'confidence': 80}
+
+
+@pytest.fixture(scope="module")
+def chart_bytes():
+    output = io.BytesIO()
+    Image.new('RGB', (320, 200), (18, 22, 30)).save(output, format='PNG')
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("output_format, expected", [('png', 'PNG'), ('Jpeg', 'JPEG'), ('webp', 'WEBP')])
+def test_output_format_is_case_insensitive(chart_bytes, output_format, expected):
+    annotator = ChartAnnotator()
+    data = annotator.create_professional_annotation(chart_bytes, SIGNALS, 'CALL', output_format)
+    assert Image.open(io.BytesIO(data)).format == expected
+    assert data == annotator.create_professional_annotation(chart_bytes, SIGNALS, 'CALL', expected)
+    call_image, put_image = annotator.generate_both_scenarios(chart_bytes, '', SIGNALS, output_format)
+    assert Image.open(io.BytesIO(put_image)).format == expected
+
+
+@pytest.mark.parametrize("entry_point", [
+    lambda a, img: a.create_professional_annotation(img, SIGNALS, 'CALL', 'gif'),
+    lambda a, img: a.annotate_chart(img, '', SIGNALS, 'gif'),
+    lambda a, img: a.annotate_chart(img, '', {'action': 'WAIT'}, 'gif'),
+    lambda a, img: a.generate_both_scenarios(img, '', SIGNALS, 'gif'),
+])
+def test_unsupported_output_format_raises_value_error(chart_bytes, entry_point):
+    with pytest.raises(ValueError, match="PNG, JPEG, WEBP"):
+        entry_point(ChartAnnotator(), chart_bytes)
+
+
+@pytest.mark.parametrize("output_format", ['PNG', 'JPEG', 'WEBP'])
+def test_no_signal_returns_chart_in_requested_format(chart_bytes, output_format):
+    data = ChartAnnotator().annotate_chart(chart_bytes, '', {'action': 'WAIT'}, output_format.lower())
+    if output_format == 'PNG':
+        assert data is chart_bytes
+    image = Image.open(io.BytesIO(data))
+    assert image.format == output_format
+    assert image.size == (320, 200)
+
+
+@pytest.fixture
+def render_cache(monkeypatch):
+    """Empty render cache, restored after the test"""
+    monkeypatch.setattr(image_annotator, '_RENDER_CACHE', OrderedDict())
+    return image_annotator._RENDER_CACHE
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    """Counts real renders (cache misses)"""
+    calls = []
+    render = ChartAnnotator.create_professional_annotation_from_base
+    
+    def counting(self, *args, **kwargs):
+        calls.append(args[2] if len(args) > 2 else kwargs.get('operation_type'))
+        return render(self, *args, **kwargs)
+    
+    monkeypatch.setattr(ChartAnnotator, 'create_professional_annotation_from_base', counting)
+    return calls
+
+
+def test_render_cache_hit_skips_rendering(chart_bytes, render_cache, render_calls):
+    first = ChartAnnotator().create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+    second = ChartAnnotator().create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+    assert second is first
+    assert len(render_calls) == 1
+    
+    # generate_both_scenarios reuses the cached CALL render and only draws PUT
+    call_image, _ = ChartAnnotator().generate_both_scenarios(chart_bytes, '', SIGNALS)
+    assert call_image is first
+    assert render_calls == ['CALL', 'PUT']
+
+
+@pytest.mark.parametrize("change", [
+    lambda a: a.colors.__setitem__('call_green', (0, 0, 255)),
+    lambda a: a.fonts.__setitem__('hero', ImageFont.load_default()),
+], ids=['palette', 'fonts'])
+def test_render_cache_keys_on_palette_and_fonts(chart_bytes, render_cache, render_calls, change):
+    ChartAnnotator().create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+    custom = ChartAnnotator()
+    change(custom)
+    data = custom.create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+    assert len(render_calls) == 2
+    render_cache.clear()
+    assert data == custom.create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+
+
+@pytest.mark.parametrize("other", [
+    dict(signals=dict(SIGNALS, stop_loss=1.0800)),
+    dict(operation_type='PUT'),
+    dict(output_format='JPEG'),
+], ids=['signals', 'operation_type', 'output_format'])
+def test_render_cache_keys_on_inputs(chart_bytes, render_cache, render_calls, other):
+    annotator = ChartAnnotator()
+    annotator.create_professional_annotation(chart_bytes, SIGNALS, 'CALL')
+    args = dict(signals=SIGNALS, operation_type='CALL', output_format='PNG')
+    args.update(other)
+    annotator.create_professional_annotation(chart_bytes, **args)
+    assert len(render_calls) == 2
@@ -0,0 +1,45 @@
+import pytest
+
+from tests.helpers import candles, scalp_rows
+from forex_core import CandleSeries
+from scalping_engine import Candle, ScalpingEngine, ScalpingIndicators
+
+
+def wilder_rsi_reference(prices, period=14):
+    """RSI de Wilder em Python puro: sementes = médias simples dos primeiros `period` deltas"""
+    if len(prices) < period + 1:
+        return 50.0
+    deltas = [cur - prev for prev, cur in zip(prices, prices[1:])]
+    gains = [d if d > 0 else 0.0 for d in deltas]
+    losses = [-d if d < 0 else 0.0 for d in deltas]
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+@pytest.mark.parametrize("n", [10, 15, 16, 50, 120])
+def test_calculate_rsi_matches_wilder_reference(n):
+    prices = [row[4] for row in scalp_rows(n, seed=n)]
+    assert ScalpingIndicators.calculate_rsi(prices, 14) == pytest.approx(wilder_rsi_reference(prices), rel=1e-9)
+
+
+def test_rsi_without_losses_is_100():
+    prices = [1.0 + 0.001 * i for i in range(40)]
+    avg_gain, avg_loss = ScalpingIndicators.wilder_averages(prices, 14)
+    assert avg_loss == 0
+    assert ScalpingIndicators.rsi_from_averages(avg_gain, avg_loss) == 100.0
+    assert ScalpingIndicators.calculate_rsi(prices, 14) == wilder_rsi_reference(prices) == 100.0
+
+
+def test_streaming_rsi_matches_wilder_reference():
+    rows = scalp_rows(300, seed=5)
+    engine = ScalpingEngine()
+    for end in range(50, len(rows), 5):
+        _, _, avg_gain, avg_loss = engine._update_indicators(CandleSeries.from_candles(candles(rows[:end], Candle)))
+        expected = wilder_rsi_reference([row[4] for row in rows[:end]])
+        assert ScalpingIndicators.rsi_from_averages(avg_gain, avg_loss) == pytest.approx(expected, rel=1e-9)